@@ -2,9 +2,19 @@ from django.conf import settings
 from django.http import HttpResponse
 
 
+_CORS_STATIC_HEADERS = {
+    "Access-Control-Allow-Methods": "GET, POST, PUT, PATCH, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+    "Access-Control-Max-Age": "86400",
+}
+
+
 class CorsMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        # Middleware is built once per process, so read settings here rather than per request
+        self.allow_all = getattr(settings, "CORS_ALLOW_ALL", False)
+        self.allowed_origins = frozenset(getattr(settings, "CORS_ALLOWED_ORIGINS", []))
 
     def __call__(self, request):
         if request.method == "OPTIONS":
@@ -16,14 +26,10 @@ class CorsMiddleware:
         if not origin:
             return response
 
-        if getattr(settings, "CORS_ALLOW_ALL", False):
-            response["Access-Control-Allow-Origin"] = origin
-        elif origin in getattr(settings, "CORS_ALLOWED_ORIGINS", []):
-            response["Access-Control-Allow-Origin"] = origin
-        else:
+        if not self.allow_all and origin not in self.allowed_origins:
             return response
 
-        response["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
-        response["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-        response["Access-Control-Max-Age"] = "86400"
+        response["Access-Control-Allow-Origin"] = origin
+        for header, value in _CORS_STATIC_HEADERS.items():
+            response[header] = value
         return response
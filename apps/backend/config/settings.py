@@ -132,3 +132,6 @@ CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND")
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+
+# Pub/sub channel for streaming research events (SSE)
+RESEARCH_EVENTS_REDIS_URL = env("RESEARCH_EVENTS_REDIS_URL", default=CELERY_BROKER_URL)
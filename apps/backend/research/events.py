@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+from open_deep_research.utils import split_report_summary
+
+
+# Top-level LangGraph nodes worth reporting as progress
+WORKFLOW_NODES = frozenset(
+    {"clarify_with_user", "write_research_brief", "research_supervisor", "final_report_generation"}
+)
+
+
+@lru_cache(maxsize=1)
+def _client() -> redis.Redis:
+    return redis.Redis.from_url(settings.RESEARCH_EVENTS_REDIS_URL)
+
+
+def _channel(session_id: str) -> str:
+    return f"research:{session_id}:events"
+
+
+def publish_event(session_id: str, event: dict) -> None:
+    """
+    Best-effort publish; streaming must never break the research run.
+    """
+    try:
+        _client().publish(_channel(session_id), json.dumps(event, default=str))
+    except redis.RedisError:
+        pass
+
+
+def subscribe(session_id: str):
+    pubsub = _client().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(_channel(session_id))
+    return pubsub
+
+
+def to_stream_event(event: dict) -> dict | None:
+    """
+    Reduce a LangGraph `astream_events` (v2) event to what clients need:
+    node progress plus final report tokens. Everything else is dropped.
+    """
+    kind = event.get("event")
+    name = event.get("name")
+
+    if kind in ("on_chain_start", "on_chain_end") and name in WORKFLOW_NODES:
+        if (event.get("metadata") or {}).get("langgraph_node") != name:
+            return None
+        return {"type": "node", "node": name, "phase": "start" if kind == "on_chain_start" else "end"}
+
+    if kind == "on_chat_model_stream":
+        if (event.get("metadata") or {}).get("langgraph_node") != "final_report_generation":
+            return None
+        chunk = (event.get("data") or {}).get("chunk")
+        content = getattr(chunk, "content", "")
+        if isinstance(content, list):
+            content = "".join(
+                part.get("text", "") for part in content if isinstance(part, dict)
+            )
+        if not content:
+            return None
+        return {"type": "token", "content": content}
+
+    return None
+
+
+class ReportSummaryFilter:
+    """
+    Drops the <report_summary> block (see include_report_summary) from streamed
+    report tokens so clients see what gets persisted as the report. Like
+    split_report_summary, only the last opening tag starts the block, so text
+    from the newest tag on (plus whitespace before it) is held until another
+    tag releases it or the stream ends.
+    """
+
+    OPEN = "<report_summary>"
+
+    def __init__(self):
+        self._held = ""
+
+    def feed(self, text: str) -> str:
+        text = self._held + text
+        start = text.rfind(self.OPEN)
+        if start != -1:
+            cut = len(text[:start].rstrip())
+        else:
+            # A tag may be split across chunks, so a possible partial tag is held back
+            keep = next(
+                (k for k in range(min(len(self.OPEN) - 1, len(text)), 0, -1) if self.OPEN.startswith(text[-k:])),
+                0,
+            )
+            cut = len(text[: len(text) - keep].rstrip())
+        self._held = text[cut:]
+        return text[:cut]
+
+    def flush(self) -> str:
+        held, self._held = self._held, ""
+        # Everything before the held text was released, so this is the report's tail
+        return split_report_summary(held)[0]
+
+
+class StreamPublisher:
+    """
+    Publishes stream events from inside the workflow's event loop. Tokens are
+    coalesced (by size or age) and every Redis call runs in a worker thread,
+    so the report node isn't held up by a round-trip per token.
+    """
+
+    def __init__(self, session_id: str, flush_chars: int = 256, flush_seconds: float = 0.25):
+        self.session_id = session_id
+        self.flush_chars = flush_chars
+        self.flush_seconds = flush_seconds
+        self._tokens: list[str] = []
+        self._token_chars = 0
+        self._last_flush = time.monotonic()
+
+    async def send(self, payload: dict) -> None:
+        if payload.get("type") == "token":
+            self._tokens.append(payload["content"])
+            self._token_chars += len(payload["content"])
+            if (
+                self._token_chars >= self.flush_chars
+                or time.monotonic() - self._last_flush >= self.flush_seconds
+            ):
+                await self.flush()
+            return
+
+        # Keep ordering: pending tokens go out before any other event
+        await self.flush()
+        await asyncio.to_thread(publish_event, self.session_id, payload)
+
+    async def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._tokens:
+            return
+        content = "".join(self._tokens)
+        self._tokens.clear()
+        self._token_chars = 0
+        await asyncio.to_thread(publish_event, self.session_id, {"type": "token", "content": content})
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-15 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='researchsession',
+            index=models.Index(fields=['user', '-created_at'], name='session_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadeddocument',
+            index=models.Index(fields=['session', 'created_at'], name='uploaddoc_session_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadeddocument',
+            index=models.Index(condition=models.Q(('extracted_summary', ''), ('extracted_text', '')), fields=['session', 'created_at'], name='uploaddoc_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-15 10:30
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research', '0002_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='researchreport',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['sources'], name='report_sources_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -1,5 +1,6 @@
 import uuid
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 
@@ -35,6 +36,12 @@ class ResearchSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # history: filter(user=...).order_by("-created_at")
+            models.Index(fields=["user", "-created_at"], name="session_user_created_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.id} - {self.status}"
 
@@ -70,6 +77,12 @@ class ResearchReport(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # jsonb containment, e.g. sources__contains=[{"url": ...}]
+            GinIndex(fields=["sources"], name="report_sources_gin", opclasses=["jsonb_path_ops"]),
+        ]
+
 
 class UploadedDocument(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -84,8 +97,22 @@ class UploadedDocument(models.Model):
     extracted_text = models.TextField(blank=True, default="")
     extracted_summary = models.TextField(blank=True, default="")
 
+    # Set while a batch run owns the row (see process_pending_documents_batch)
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["session", "created_at"], name="uploaddoc_session_created_idx"),
+            # Pending (not yet extracted) documents, polled by run_research
+            models.Index(
+                fields=["session", "created_at"],
+                name="uploaddoc_pending_idx",
+                condition=models.Q(extracted_summary="", extracted_text=""),
+            ),
+        ]
+
 
 class ResearchCost(models.Model):
     session = models.OneToOneField(
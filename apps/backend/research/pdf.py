@@ -0,0 +1,20 @@
+import io
+
+import fitz
+
+
+# Kept free of Django imports: pool workers import this module on their own
+# (spawn/forkserver start methods) without django.setup().
+
+# Plain text extraction without ligature/image preservation (cheaper per page).
+PDF_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def extract_page_range(path: str, start: int, end: int) -> str:
+    # Runs in a pool process, so it opens the document itself
+    buf = io.StringIO()
+    with fitz.open(path) as doc:
+        for page_no in range(start, end):
+            buf.write(doc[page_no].get_text("text", flags=PDF_TEXT_FLAGS))
+            buf.write("\n")
+    return buf.getvalue()
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+from celery.signals import worker_process_init
+
+
+# One event loop per worker thread, reused across tasks so async HTTP clients
+# (and their connection pools) survive between invocations.
+_local = threading.local()
+
+
+@worker_process_init.connect
+def _reset_loop_after_fork(**kwargs):
+    # Don't reuse a loop inherited from the parent process
+    _local.__dict__.pop("loop", None)
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _local.loop = loop
+    return loop
+
+
+def run_coro(coro):
+    """
+    Drop-in replacement for asyncio.run() inside Celery tasks: same cleanup of
+    leftover tasks and async generators, but the loop stays open for reuse.
+    """
+    loop = get_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        _cancel_leftovers(loop)
+
+
+def _cancel_leftovers(loop: asyncio.AbstractEventLoop) -> None:
+    # Tasks a run spawned but never awaited (e.g. sibling researchers after one
+    # failed) must not keep running into the next Celery task on this loop
+    pending = asyncio.all_tasks(loop)
+    for task in pending:
+        task.cancel()
+    if pending:
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    loop.run_until_complete(loop.shutdown_asyncgens())
@@ -1,5 +1,7 @@
+import copy
+
 from rest_framework import serializers
-from .models import ResearchSession
+from .models import ResearchCost, ResearchSession
 
 
 class StartResearchSerializer(serializers.Serializer):
@@ -15,3 +17,57 @@ class ResearchSessionListSerializer(serializers.ModelSerializer):
     class Meta:
         model = ResearchSession
         fields = ["id", "original_query", "status", "trace_id", "parent", "created_at", "updated_at"]
+
+
+class ResearchTokenUsageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResearchCost
+        fields = ["input_tokens", "output_tokens", "total_tokens"]
+
+
+class ResearchDetailSerializer(serializers.ModelSerializer):
+    """
+    Session plus its result rows; expects select_related("report", "summary", "reasoning", "cost").
+    """
+    report = serializers.CharField(source="report.report", read_only=True)
+    sources = serializers.JSONField(source="report.sources", read_only=True)
+    summary = serializers.CharField(source="summary.summary", read_only=True)
+    reasoning = serializers.CharField(source="reasoning.reasoning", read_only=True)
+    token_usage = ResearchTokenUsageSerializer(source="cost", read_only=True)
+    estimated_cost_usd = serializers.CharField(source="cost.estimated_cost_usd", read_only=True)
+
+    # DRF renders a missing related row as None; keep the API's empty-result shape instead
+    MISSING_RESULT_DEFAULTS = {
+        "report": "",
+        "sources": [],
+        "summary": "",
+        "reasoning": "",
+        "token_usage": {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0},
+        "estimated_cost_usd": "0",
+    }
+
+    class Meta:
+        model = ResearchSession
+        fields = [
+            "id",
+            "parent",
+            "original_query",
+            "status",
+            "trace_id",
+            "created_at",
+            "updated_at",
+            "report",
+            "sources",
+            "summary",
+            "reasoning",
+            "token_usage",
+            "estimated_cost_usd",
+        ]
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for field, default in self.MISSING_RESULT_DEFAULTS.items():
+            if data.get(field) is None:
+                data[field] = copy.deepcopy(default)
+        return data
@@ -1,14 +1,24 @@
 import asyncio
+import codecs
+import io
 import json
+import mmap
+import multiprocessing
 import os
 import re
 import uuid
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
 from datetime import timedelta
 from decimal import Decimal
+from functools import lru_cache
 
+import charset_normalizer
 import fitz
 from celery import shared_task
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
 from langchain.chat_models import init_chat_model
@@ -19,6 +29,7 @@ from langchain_core.runnables import RunnableConfig
 from open_deep_research.deep_researcher import deep_researcher
 from open_deep_research.utils import get_api_key_for_model
 
+from .events import ReportSummaryFilter, StreamPublisher, publish_event, to_stream_event
 from .models import (
     ResearchSession,
     ResearchReport,
@@ -27,6 +38,16 @@ from .models import (
     ResearchCost,
     UploadedDocument,
 )
+from .pdf import PDF_TEXT_FLAGS, extract_page_range
+from .runtime import run_coro
+
+
+_SRC_BRACKET = re.compile(r"^\[(\d+)\]\s*(.+)$")
+_SRC_DOTTED = re.compile(r"^(\d+)[\.\)]\s*(.+)$")
+_URL_RE = re.compile(r"(https?://\S+)")
+_SOURCES_RE = re.compile(r"sources", re.IGNORECASE)
+# Heading line such as "### Sources", "**Sources:**" or "Sources"
+_SOURCES_HEADING_RE = re.compile(r"^[ \t#*_]*sources?[ \t*_]*:?[ \t*_\r]*$", re.IGNORECASE | re.MULTILINE)
 
 
 # --- Token tracking (best-effort, model/provider dependent) ---
@@ -58,7 +79,14 @@ class TokenUsageCallback(BaseCallbackHandler):
 
 
 def _load_model_pricing() -> dict[str, tuple[Decimal, Decimal]]:
-    raw = os.environ.get("ODR_MODEL_COSTS_JSON", "").strip()
+    return _pricing_for(os.environ.get("ODR_MODEL_COSTS_JSON", "").strip())
+
+
+@lru_cache(maxsize=None)
+def _pricing_for(raw: str) -> dict[str, tuple[Decimal, Decimal]]:
+    """
+    Parse the pricing JSON once per distinct env value (callers must not mutate the result).
+    """
     if not raw:
         return {}
 
@@ -107,23 +135,105 @@ def _estimate_cost_usd(model_name: str, in_tokens: int, out_tokens: int) -> Deci
     return (Decimal(in_tokens) / Decimal(1000) * in_rate) + (Decimal(out_tokens) / Decimal(1000) * out_rate)
 
 
-def _extract_text_from_pdf(path: str) -> str:
-    text_parts = []
+def _pdf_workers(page_count: int) -> int:
+    # Celery prefork children are daemonic and cannot start their own processes
+    if multiprocessing.current_process().daemon:
+        return 1
+    if page_count < int(os.environ.get("ODR_PDF_PARALLEL_MIN_PAGES", "64")):
+        return 1
+    cpus = os.cpu_count() or 1
+    return max(1, min(cpus, int(os.environ.get("ODR_PDF_MAX_WORKERS") or cpus)))
+
+
+def _iter_pdf_text(path: str) -> Iterator[str]:
+    """
+    Yield newline-terminated page text in document order. Large PDFs are split
+    into page ranges extracted in a process pool; pending ranges are cancelled
+    if the consumer stops early. The pool is only used outside daemonic
+    processes (e.g. --pool=solo); default prefork children extract sequentially.
+    """
     with fitz.open(path) as doc:
-        for page in doc:
-            text_parts.append(page.get_text("text"))
-    return "\n".join(text_parts)
+        page_count = doc.page_count
+        workers = _pdf_workers(page_count)
+        if workers == 1:
+            for page in doc:
+                yield page.get_text("text", flags=PDF_TEXT_FLAGS) + "\n"
+            return
+
+    per_chunk = int(os.environ.get("ODR_PDF_PAGES_PER_CHUNK", "16"))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(extract_page_range, path, start, min(start + per_chunk, page_count))
+            for start in range(0, page_count, per_chunk)
+        ]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def _extract_text_from_pdf(path: str, max_chars: int | None = None) -> str:
+    """
+    Extract page text into a single buffer, stopping once max_chars is reached
+    so we don't parse pages that would be truncated anyway.
+    """
+    buf = io.StringIO()
+    written = 0
+    with closing(_iter_pdf_text(path)) as chunks:
+        for text in chunks:
+            if max_chars is not None:
+                text = text[: max_chars - written]
+            written += buf.write(text)
+            if max_chars is not None and written >= max_chars:
+                break
+    return buf.getvalue()
+
+
+_ENCODING_SAMPLE_BYTES = 64 * 1024
 
 
-def _extract_text_from_txt(path: str) -> str:
+def _extract_text_from_txt(path: str, max_chars: int | None = None) -> str:
+    """
+    Decode the memory-mapped file as strict UTF-8 (the common case, one pass);
+    only if that fails, detect the encoding from the first 64KB with
+    charset-normalizer and decode leniently. With max_chars, only the bytes
+    that can hold that many characters are decoded.
+    """
     with open(path, "rb") as handle:
-        raw = handle.read()
-    for encoding in ("utf-8", "utf-16", "latin-1"):
-        try:
-            return raw.decode(encoding)
-        except UnicodeDecodeError:
-            continue
-    return raw.decode("utf-8", errors="ignore")
+        if os.fstat(handle.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # No supported encoding uses more than 4 bytes per character
+            limit = len(mm) if max_chars is None else min(len(mm), max_chars * 4)
+            with memoryview(mm)[:limit] as data:
+                try:
+                    # Incremental so a sequence cut at the prefix boundary isn't an error
+                    text = codecs.getincrementaldecoder("utf-8")().decode(data, final=limit == len(mm))
+                except UnicodeDecodeError:
+                    best = charset_normalizer.from_bytes(bytes(data[:_ENCODING_SAMPLE_BYTES])).best()
+                    encoding = best.encoding if best else "utf-8"
+                    if encoding == "ascii":
+                        # ASCII sample but invalid UTF-8 later on: stay with UTF-8
+                        encoding = "utf-8"
+                    text = str(data, encoding, "ignore")
+    return text if max_chars is None else text[:max_chars]
+
+
+@lru_cache(maxsize=32)
+def _get_chat_model(model_name: str, max_tokens: int, loop: asyncio.AbstractEventLoop):
+    """
+    One client per (model, max_tokens, event loop), so its HTTP connection pool
+    is reused across tasks. Async pools are bound to the loop that first used
+    them, and runtime.get_loop gives each worker thread its own loop (e.g. under
+    --pool=threads), so the loop is part of the key.
+    """
+    return init_chat_model(
+        model=model_name,
+        max_tokens=max_tokens,
+        api_key=get_api_key_for_model(model_name, RunnableConfig()),
+    )
 
 
 def _summarize_text(
@@ -132,24 +242,26 @@ def _summarize_text(
     max_tokens: int,
     prompt: str,
     token_cb: BaseCallbackHandler | None = None,
+) -> str:
+    return run_coro(_summarize_text_async(text, model_name, max_tokens, prompt, token_cb))
+
+
+async def _summarize_text_async(
+    text: str,
+    model_name: str,
+    max_tokens: int,
+    prompt: str,
+    token_cb: BaseCallbackHandler | None = None,
 ) -> str:
     if not text or not model_name:
         return ""
 
-    api_key = get_api_key_for_model(model_name, RunnableConfig())
-    model = init_chat_model(
-        model=model_name,
-        max_tokens=max_tokens,
-        api_key=api_key,
-    )
+    model = _get_chat_model(model_name, max_tokens, asyncio.get_running_loop())
 
     config = {"callbacks": [token_cb]} if token_cb else None
 
-    async def _run():
-        return await model.ainvoke([HumanMessage(content=prompt + text)], config=config)
-
     try:
-        response = asyncio.run(_run())
+        response = await model.ainvoke([HumanMessage(content=prompt + text)], config=config)
     except Exception:
         return ""
 
@@ -161,8 +273,14 @@ def _extract_sources_from_report(report_text: str) -> list[dict]:
     if not report_text:
         return []
 
-    lower = report_text.lower()
-    idx = lower.rfind("sources")
+    # Prefer the last "Sources" heading; fall back to the last mention anywhere.
+    # Both scan the report once without building a lowercased copy.
+    idx = -1
+    for match in _SOURCES_HEADING_RE.finditer(report_text):
+        idx = match.end()
+    if idx == -1:
+        for match in _SOURCES_RE.finditer(report_text):
+            idx = match.start()
     if idx == -1:
         return []
 
@@ -173,14 +291,14 @@ def _extract_sources_from_report(report_text: str) -> list[dict]:
         if not line:
             continue
         line = line.lstrip("-* ").strip()
-        match = re.match(r"^\[(\d+)\]\s*(.+)$", line)
+        match = _SRC_BRACKET.match(line)
         if not match:
-            match = re.match(r"^(\d+)[\.\)]\s*(.+)$", line)
+            match = _SRC_DOTTED.match(line)
         if not match:
             continue
         source_id = match.group(1)
         rest = match.group(2).strip()
-        url_match = re.search(r"(https?://\S+)", rest)
+        url_match = _URL_RE.search(rest)
         url = url_match.group(1).rstrip(").,]>") if url_match else ""
         sources.append(
             {
@@ -192,6 +310,165 @@ def _extract_sources_from_report(report_text: str) -> list[dict]:
     return sources
 
 
+def _upsert_for_session(model, session: ResearchSession, **fields) -> None:
+    """
+    Single INSERT ... ON CONFLICT (session_id) DO UPDATE for the one-to-one
+    result tables, instead of update_or_create's SELECT + INSERT/UPDATE.
+    """
+    model.objects.bulk_create(
+        [model(session=session, **fields)],
+        update_conflicts=True,
+        unique_fields=["session"],
+        update_fields=list(fields),
+    )
+
+
+async def _stream_workflow(session_id: str, user_content: str, config: RunnableConfig) -> dict:
+    """
+    Run the workflow via astream_events, relaying progress/tokens to SSE subscribers,
+    and return the final graph state for persistence.
+    """
+    final_state = {}
+    publisher = StreamPublisher(session_id)
+    summary_filter = ReportSummaryFilter()
+
+    async def _flush_held_tokens():
+        held = summary_filter.flush()
+        if held:
+            await publisher.send({"type": "token", "content": held})
+
+    async for event in deep_researcher.astream_events(
+        {"messages": [HumanMessage(content=user_content)]},
+        config=config,
+        version="v2",
+    ):
+        if event["event"] == "on_chain_end" and not event.get("parent_ids"):
+            output = (event.get("data") or {}).get("output")
+            if isinstance(output, dict):
+                final_state = output
+            continue
+
+        payload = to_stream_event(event)
+        if not payload:
+            continue
+        if payload["type"] == "token":
+            # The fused summary is persisted separately, not streamed as report text
+            payload["content"] = summary_filter.feed(payload["content"])
+            if payload["content"]:
+                await publisher.send(payload)
+            continue
+
+        await _flush_held_tokens()
+        await publisher.send(payload)
+
+    await _flush_held_tokens()
+    await publisher.flush()
+    return final_state
+
+
+async def _report_summary(
+    final_state: dict,
+    report_text: str,
+    configurable: dict,
+    token_cb: BaseCallbackHandler,
+) -> str:
+    # Written by the final report model in the same call; only summarize
+    # separately if it didn't come back (e.g. the model ignored the format)
+    summary_text = (final_state.get("report_summary") or "").strip()
+    if not summary_text:
+        summary_model = (
+            os.environ.get("ODR_REPORT_SUMMARY_MODEL")
+            or configurable.get("compression_model")
+            or configurable.get("final_report_model")
+            or ""
+        )
+        summary_max_tokens = int(os.environ.get("ODR_REPORT_SUMMARY_MAX_TOKENS", "350"))
+        summary_char_limit = int(os.environ.get("ODR_REPORT_SUMMARY_MAX_CHARS", "12000"))
+        summary_prompt = (
+            "Summarize the research report in 5-10 bullet points. "
+            "Focus on key findings, numbers, and conclusions. "
+            "Do not include chain-of-thought.\n\nReport:\n"
+        )
+        summary_text = await _summarize_text_async(
+            report_text[:summary_char_limit],
+            summary_model,
+            summary_max_tokens,
+            summary_prompt,
+            token_cb=token_cb,
+        )
+    if not summary_text:
+        summary_text = report_text[:1200].strip()
+    return summary_text
+
+
+def _build_reasoning(
+    final_state: dict,
+    sources: list,
+    configurable: dict,
+    parent_summary: str,
+    doc_summaries: list[str],
+) -> str:
+    research_brief = (final_state.get("research_brief") or "").strip()
+    if len(research_brief) > 500:
+        research_brief = research_brief[:500] + "..."
+
+    reasoning_lines = [
+        "High-level reasoning:",
+        "- Used open_deep_research LangGraph workflow (clarify → brief → supervisor → final report).",
+        f"- Search API: {configurable.get('search_api', 'default')}.",
+    ]
+    if research_brief:
+        reasoning_lines.append(f"- Planning: derived brief -> {research_brief}")
+    else:
+        reasoning_lines.append("- Planning: derived a focused brief from the query.")
+    if sources:
+        reasoning_lines.append(f"- Source selection: kept {len(sources)} sources for citations.")
+    else:
+        reasoning_lines.append("- Source selection: kept the most relevant sources.")
+    if parent_summary:
+        reasoning_lines.append("- Continuation: used prior summary to avoid repeating topics.")
+    if doc_summaries:
+        reasoning_lines.append(f"- User documents: incorporated {len(doc_summaries)} uploaded summaries.")
+
+    return "\n".join(reasoning_lines)
+
+
+async def _run_workflow(
+    session_id: str,
+    user_content: str,
+    config: RunnableConfig,
+    parent_summary: str,
+    doc_summaries: list[str],
+    token_cb: BaseCallbackHandler,
+) -> tuple[str, list, str, str]:
+    """
+    Stream the workflow, then derive what gets persisted. The report summary
+    (an LLM call when the model didn't return one) is started as a task so
+    source extraction and reasoning are built while it's in flight.
+    """
+    configurable = config["configurable"]
+    final_state = await _stream_workflow(session_id, user_content, config)
+
+    # Best-effort extraction (key names can vary)
+    report_text = (
+        final_state.get("final_report")
+        or final_state.get("report")
+        or final_state.get("output")
+        or ""
+    )
+    summary_task = asyncio.create_task(
+        _report_summary(final_state, report_text, configurable, token_cb)
+    )
+
+    sources = final_state.get("sources") or final_state.get("citations") or []
+    if not sources:
+        sources = _extract_sources_from_report(report_text)
+    reasoning_text = _build_reasoning(final_state, sources, configurable, parent_summary, doc_summaries)
+
+    summary_text = await summary_task
+    return report_text, sources, summary_text, reasoning_text
+
+
 @shared_task
 def ping_task(session_id: str):
     # keep this around as a simple health check
@@ -199,88 +476,158 @@ def ping_task(session_id: str):
     return "ok"
 
 
-@shared_task
-def process_uploaded_document(document_id: str):
-    doc = UploadedDocument.objects.select_related("session").filter(id=document_id).first()
-    if not doc:
-        return "document not found"
+_UPLOAD_SUMMARY_PROMPT = (
+    "Summarize the following document for research context. "
+    "Return 5-10 concise bullet points with key facts, entities, and numbers.\n\n"
+    "Document:\n"
+)
+
+_UPLOAD_BATCH_SUMMARY_PROMPT = (
+    "Summarize each document below for research context. "
+    "For each one, write 5-10 concise bullet points with key facts, entities, and numbers. "
+    "Return ONLY a JSON list of strings, where entry j is the summary of DOC j.\n\n"
+)
+
 
+def _extract_upload_text(doc: UploadedDocument, max_chars: int) -> str:
     path = doc.file.path
     ext = os.path.splitext(doc.filename or path)[1].lower()
-
+    if ext == ".pdf":
+        return _extract_text_from_pdf(path, max_chars=max_chars)
+    if ext == ".txt":
+        return _extract_text_from_txt(path, max_chars=max_chars)
+    return ""
+
+
+def _batch_by_chars(items: list[tuple[UploadedDocument, str]], budget: int, max_docs: int | None = None):
+    # max_docs bounds the output tokens requested per call (max_tokens per document)
+    batch, size = [], 0
+    for item in items:
+        if batch and (size + len(item[1]) > budget or (max_docs and len(batch) >= max_docs)):
+            yield batch
+            batch, size = [], 0
+        batch.append(item)
+        size += len(item[1])
+    if batch:
+        yield batch
+
+
+def _parse_batch_summaries(raw: str, expected: int) -> list[str]:
+    """
+    Parse the model's JSON list; anything unusable yields empty entries
+    so callers fall back to the stored text.
+    """
+    # Tolerate code fences / chatter around the list
+    start, end = raw.find("["), raw.rfind("]")
     try:
-        if ext == ".pdf":
-            extracted = _extract_text_from_pdf(path)
-        elif ext == ".txt":
-            extracted = _extract_text_from_txt(path)
-        else:
-            extracted = ""
-    except Exception as exc:
-        doc.extracted_text = ""
-        doc.extracted_summary = f"Extraction failed: {type(exc).__name__}"
-        doc.save(update_fields=["extracted_text", "extracted_summary"])
-        return "failed"
-
-    extracted = extracted.strip()
-    if not extracted:
-        doc.extracted_text = ""
-        doc.extracted_summary = ""
-        doc.save(update_fields=["extracted_text", "extracted_summary"])
-        return "empty"
+        data = json.loads(raw[start : end + 1]) if start != -1 and end > start else None
+    except json.JSONDecodeError:
+        data = None
+    if not isinstance(data, list):
+        return [""] * expected
+
+    summaries = []
+    for entry in data[:expected]:
+        if isinstance(entry, list):
+            entry = "\n".join(f"- {str(item).strip()}" for item in entry)
+        summaries.append(str(entry).strip() if entry else "")
+    return summaries + [""] * (expected - len(summaries))
+
+
+def _summarize_documents(texts: list[str], model_name: str, max_tokens: int) -> list[str]:
+    if len(texts) == 1:
+        return [_summarize_text(texts[0], model_name, max_tokens, _UPLOAD_SUMMARY_PROMPT)]
+
+    body = "\n\n".join(f"DOC {i}:\n{text}" for i, text in enumerate(texts, start=1))
+    raw = _summarize_text(body, model_name, max_tokens * len(texts), _UPLOAD_BATCH_SUMMARY_PROMPT)
+    return _parse_batch_summaries(raw, len(texts)) if raw else [""] * len(texts)
+
+
+@shared_task
+def process_pending_documents_batch(session_id: str):
+    """
+    Extract and summarize every pending upload of a session, sharing one LLM
+    call per batch (ODR_UPLOAD_BATCH_MAX_CHARS / _MAX_DOCS) instead of one per document.
+    Queued (delayed) on each upload; rows are claimed first, so overlapping runs
+    never process the same document and later runs find nothing left to do.
+    """
+    claim_timeout = int(os.environ.get("ODR_UPLOAD_CLAIM_TIMEOUT_SECONDS", "600"))
+    now = timezone.now()
+    with transaction.atomic():
+        docs = list(
+            UploadedDocument.objects.select_for_update(skip_locked=True)
+            .filter(session_id=session_id, extracted_summary="", extracted_text="")
+            # Unclaimed, or claimed by a run that died before finishing
+            .filter(
+                Q(processing_started_at__isnull=True)
+                | Q(processing_started_at__lt=now - timedelta(seconds=claim_timeout))
+            )
+            .order_by("created_at")
+        )
+        if not docs:
+            return "no pending documents"
+        UploadedDocument.objects.filter(id__in=[doc.id for doc in docs]).update(processing_started_at=now)
 
     store_limit = int(os.environ.get("ODR_UPLOAD_STORE_MAX_CHARS", "50000"))
     summary_limit = int(os.environ.get("ODR_UPLOAD_MAX_CHARS", "20000"))
+    batch_limit = int(os.environ.get("ODR_UPLOAD_BATCH_MAX_CHARS", "120000"))
+    batch_max_docs = int(os.environ.get("ODR_UPLOAD_BATCH_MAX_DOCS", "8"))
     summary_model = os.environ.get("ODR_UPLOAD_SUMMARY_MODEL") or os.environ.get("ODR_COMPRESSION_MODEL") or ""
     summary_max_tokens = int(os.environ.get("ODR_UPLOAD_SUMMARY_MAX_TOKENS", "400"))
 
-    stored_text = extracted[:store_limit]
-
-    summary_prompt = (
-        "Summarize the following document for research context. "
-        "Return 5-10 concise bullet points with key facts, entities, and numbers.\n\n"
-        "Document:\n"
-    )
-
-    summary_text = _summarize_text(
-        extracted[:summary_limit],
-        summary_model,
-        summary_max_tokens,
-        summary_prompt,
-    )
+    to_summarize = []
+    for doc in docs:
+        doc.processing_started_at = None
+        try:
+            extracted = _extract_upload_text(doc, max(store_limit, summary_limit)).strip()
+        except Exception as exc:
+            doc.extracted_text = ""
+            doc.extracted_summary = f"Extraction failed: {type(exc).__name__}"
+            continue
 
-    if not summary_text:
-        summary_text = stored_text[:1500].strip()
+        doc.extracted_text = extracted[:store_limit]
+        doc.extracted_summary = ""
+        if extracted:
+            to_summarize.append((doc, extracted[:summary_limit]))
 
-    doc.extracted_text = stored_text
-    doc.extracted_summary = summary_text
-    doc.save(update_fields=["extracted_text", "extracted_summary"])
+    for batch in _batch_by_chars(to_summarize, batch_limit, batch_max_docs):
+        summaries = _summarize_documents([text for _, text in batch], summary_model, summary_max_tokens)
+        for (doc, _), summary_text in zip(batch, summaries):
+            doc.extracted_summary = summary_text or doc.extracted_text[:1500].strip()
 
-    return "processed"
+    UploadedDocument.objects.bulk_update(docs, ["extracted_text", "extracted_summary", "processing_started_at"])
+    return f"processed {len(docs)}"
 
 
 @shared_task
 def run_research(session_id: str):
-    session = ResearchSession.objects.select_related("parent").filter(id=session_id).first()
+    session = (
+        ResearchSession.objects.select_related("parent", "parent__summary").filter(id=session_id).first()
+    )
     if not session:
         return "session not found"
 
-    pending_docs = UploadedDocument.objects.filter(
-        session=session, extracted_summary="", extracted_text=""
-    ).order_by("created_at")
-    if pending_docs.exists():
-        oldest = pending_docs.first()
+    # Only the timestamp is needed; don't pull the TEXT columns of pending rows
+    oldest_pending_at = (
+        UploadedDocument.objects.filter(session=session, extracted_summary="", extracted_text="")
+        .order_by("created_at")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    if oldest_pending_at:
         wait_window = int(os.environ.get("ODR_UPLOAD_WAIT_SECONDS", "120"))
-        if oldest and timezone.now() - oldest.created_at < timedelta(seconds=wait_window):
+        if timezone.now() - oldest_pending_at < timedelta(seconds=wait_window):
             run_research.apply_async(args=[session_id], countdown=15)
             return "waiting for documents"
 
     # Mark running after document processing window
     ResearchSession.objects.filter(id=session_id).update(status=ResearchSession.Status.RUNNING)
+    publish_event(session_id, {"type": "status", "status": ResearchSession.Status.RUNNING})
 
     # Build context to avoid repetition
     parent_summary = ""
-    if session.parent_id and hasattr(session.parent, "summary"):
-        parent_summary = session.parent.summary.summary or ""
+    if session.parent_id:
+        parent_summary = getattr(getattr(session.parent, "summary", None), "summary", "") or ""
 
     doc_summaries = list(
         UploadedDocument.objects.filter(session=session).values_list("extracted_summary", flat=True)
@@ -319,6 +666,7 @@ def run_research(session_id: str):
         "summarization_model": os.environ.get("ODR_SUMMARIZATION_MODEL")
         or os.environ.get("ODR_COMPRESSION_MODEL", ""),
         "allow_clarification": False,  # your API is async; don’t block on clarification
+        "include_report_summary": True,  # summary comes back with the report (no extra LLM call)
     }
 
     # Remove empty config values so defaults still work
@@ -334,72 +682,10 @@ def run_research(session_id: str):
     )
 
     try:
-        # Run the LangGraph async workflow inside Celery
-        final_state = asyncio.run(
-            deep_researcher.ainvoke(
-                {"messages": [HumanMessage(content=user_content)]},
-                config=config,
-            )
-        )
-
-        # Best-effort extraction (key names can vary)
-        report_text = (
-            final_state.get("final_report")
-            or final_state.get("report")
-            or final_state.get("output")
-            or ""
-        )
-
-        sources = final_state.get("sources") or final_state.get("citations") or []
-        if not sources:
-            sources = _extract_sources_from_report(report_text)
-
-        summary_model = (
-            os.environ.get("ODR_REPORT_SUMMARY_MODEL")
-            or configurable.get("compression_model")
-            or configurable.get("final_report_model")
-            or ""
-        )
-        summary_max_tokens = int(os.environ.get("ODR_REPORT_SUMMARY_MAX_TOKENS", "350"))
-        summary_char_limit = int(os.environ.get("ODR_REPORT_SUMMARY_MAX_CHARS", "12000"))
-        summary_prompt = (
-            "Summarize the research report in 5-10 bullet points. "
-            "Focus on key findings, numbers, and conclusions. "
-            "Do not include chain-of-thought.\n\nReport:\n"
-        )
-        summary_text = _summarize_text(
-            report_text[:summary_char_limit],
-            summary_model,
-            summary_max_tokens,
-            summary_prompt,
-            token_cb=token_cb,
+        # Run the LangGraph async workflow inside Celery, streaming events as they happen
+        report_text, sources, summary_text, reasoning_text = run_coro(
+            _run_workflow(session_id, user_content, config, parent_summary, doc_summaries, token_cb)
         )
-        if not summary_text:
-            summary_text = report_text[:1200].strip()
-
-        research_brief = (final_state.get("research_brief") or "").strip()
-        if len(research_brief) > 500:
-            research_brief = research_brief[:500] + "..."
-
-        reasoning_lines = [
-            "High-level reasoning:",
-            "- Used open_deep_research LangGraph workflow (clarify → brief → supervisor → final report).",
-            f"- Search API: {configurable.get('search_api', 'default')}.",
-        ]
-        if research_brief:
-            reasoning_lines.append(f"- Planning: derived brief -> {research_brief}")
-        else:
-            reasoning_lines.append("- Planning: derived a focused brief from the query.")
-        if sources:
-            reasoning_lines.append(f"- Source selection: kept {len(sources)} sources for citations.")
-        else:
-            reasoning_lines.append("- Source selection: kept the most relevant sources.")
-        if parent_summary:
-            reasoning_lines.append("- Continuation: used prior summary to avoid repeating topics.")
-        if doc_summaries:
-            reasoning_lines.append(f"- User documents: incorporated {len(doc_summaries)} uploaded summaries.")
-
-        reasoning_text = "\n".join(reasoning_lines)
 
         cost_model_name = (
             os.environ.get("ODR_COST_MODEL")
@@ -420,32 +706,20 @@ def run_research(session_id: str):
             session.status = ResearchSession.Status.COMPLETED
             session.save(update_fields=["trace_id", "status", "updated_at"])
 
-            ResearchReport.objects.update_or_create(
-                session=session,
-                defaults={"report": report_text, "sources": sources},
-            )
-
-            ResearchSummary.objects.update_or_create(
-                session=session,
-                defaults={"summary": summary_text},
-            )
-
-            ResearchReasoning.objects.update_or_create(
-                session=session,
-                defaults={"reasoning": reasoning_text},
-            )
-
-            ResearchCost.objects.update_or_create(
-                session=session,
-                defaults={
-                    "input_tokens": in_tokens,
-                    "output_tokens": out_tokens,
-                    "total_tokens": total_tokens,
-                    "estimated_cost_usd": est_cost,
-                    "model_name": cost_model_name,
-                },
+            _upsert_for_session(ResearchReport, session, report=report_text, sources=sources)
+            _upsert_for_session(ResearchSummary, session, summary=summary_text)
+            _upsert_for_session(ResearchReasoning, session, reasoning=reasoning_text)
+            _upsert_for_session(
+                ResearchCost,
+                session,
+                input_tokens=in_tokens,
+                output_tokens=out_tokens,
+                total_tokens=total_tokens,
+                estimated_cost_usd=est_cost,
+                model_name=cost_model_name,
             )
 
+        publish_event(session_id, {"type": "status", "status": ResearchSession.Status.COMPLETED})
         return "completed"
 
     except Exception as e:
@@ -455,9 +729,9 @@ def run_research(session_id: str):
             session.trace_id = trace_id
             session.save(update_fields=["status", "trace_id", "updated_at"])
 
-            ResearchReasoning.objects.update_or_create(
-                session=session,
-                defaults={"reasoning": f"Run failed: {type(e).__name__}: {str(e)}"},
+            _upsert_for_session(
+                ResearchReasoning, session, reasoning=f"Run failed: {type(e).__name__}: {str(e)}"
             )
 
+        publish_event(session_id, {"type": "status", "status": ResearchSession.Status.FAILED})
         return f"failed: {type(e).__name__}"
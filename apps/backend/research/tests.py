@@ -1,3 +1,487 @@
-from django.test import TestCase
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import fitz
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from rest_framework.renderers import JSONRenderer
+
+from open_deep_research.utils import split_report_summary
+
+from .events import ReportSummaryFilter, StreamPublisher, to_stream_event
+from .models import ResearchCost, ResearchReasoning, ResearchReport, ResearchSession, ResearchSummary
+from .pdf import extract_page_range
+from .runtime import get_loop, run_coro
+from .serializers import ResearchDetailSerializer
+from .tasks import (
+    _batch_by_chars,
+    _extract_text_from_pdf,
+    _extract_text_from_txt,
+    _parse_batch_summaries,
+)
+from .views import _iter_research_events
+
+
+class ParseBatchSummariesTests(SimpleTestCase):
+    def test_plain_json_list(self):
+        self.assertEqual(_parse_batch_summaries('["a", "b"]', 2), ["a", "b"])
+
+    def test_fenced_json_with_chatter(self):
+        raw = 'Here you go:\n```json\n["- one", "- two"]\n```\nDone.'
+        self.assertEqual(_parse_batch_summaries(raw, 2), ["- one", "- two"])
+
+    def test_short_list_is_padded(self):
+        self.assertEqual(_parse_batch_summaries('["only"]', 3), ["only", "", ""])
+
+    def test_long_list_is_truncated(self):
+        self.assertEqual(_parse_batch_summaries('["a", "b", "c"]', 2), ["a", "b"])
+
+    def test_list_of_lists_becomes_bullets(self):
+        raw = '[["fact 1", " fact 2 "], "plain"]'
+        self.assertEqual(_parse_batch_summaries(raw, 2), ["- fact 1\n- fact 2", "plain"])
+
+    def test_empty_and_null_entries(self):
+        self.assertEqual(_parse_batch_summaries('[null, "", "x"]', 3), ["", "", "x"])
+
+    def test_invalid_json(self):
+        self.assertEqual(_parse_batch_summaries('["unterminated', 2), ["", ""])
+
+    def test_not_a_list(self):
+        self.assertEqual(_parse_batch_summaries('{"a": 1}', 2), ["", ""])
+        self.assertEqual(_parse_batch_summaries("no json here", 1), [""])
+
+
+class BatchByCharsTests(SimpleTestCase):
+    @staticmethod
+    def _items(*sizes):
+        return [(i, "x" * size) for i, size in enumerate(sizes)]
+
+    @staticmethod
+    def _ids(batches):
+        return [[doc for doc, _ in batch] for batch in batches]
+
+    def test_empty(self):
+        self.assertEqual(list(_batch_by_chars([], 10)), [])
+
+    def test_exact_budget_stays_in_one_batch(self):
+        self.assertEqual(self._ids(_batch_by_chars(self._items(4, 6), 10)), [[0, 1]])
+
+    def test_over_budget_starts_new_batch(self):
+        self.assertEqual(self._ids(_batch_by_chars(self._items(4, 7, 3), 10)), [[0], [1, 2]])
+
+    def test_oversized_item_gets_own_batch(self):
+        self.assertEqual(self._ids(_batch_by_chars(self._items(25, 2, 30), 10)), [[0], [1], [2]])
+
+    def test_order_preserved(self):
+        batches = list(_batch_by_chars(self._items(3, 3, 3, 3), 6))
+        self.assertEqual(self._ids(batches), [[0, 1], [2, 3]])
+
+    def test_max_docs_caps_batch_size(self):
+        batches = _batch_by_chars(self._items(1, 1, 1, 1, 1), 100, max_docs=2)
+        self.assertEqual(self._ids(batches), [[0, 1], [2, 3], [4]])
+
+    def test_max_docs_and_budget_combined(self):
+        batches = _batch_by_chars(self._items(1, 1, 9, 1, 1, 1), 10, max_docs=3)
+        self.assertEqual(self._ids(batches), [[0, 1], [2, 3], [4, 5]])
+
+
+class ExtractTextFromTxtTests(SimpleTestCase):
+    def _write(self, data: bytes) -> str:
+        handle = tempfile.NamedTemporaryFile(suffix=".txt", delete=False)
+        handle.write(data)
+        handle.close()
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+
+    def test_utf8_after_long_ascii_prefix(self):
+        text = "a" * 70000 + "héllo – 世界"
+        self.assertEqual(_extract_text_from_txt(self._write(text.encode("utf-8"))), text)
+
+    def test_max_chars_cut_inside_multibyte_sequence(self):
+        # 3 * 4 = 12 byte prefix ends halfway through the 6th "é"
+        path = self._write(("a" + "é" * 10).encode("utf-8"))
+        self.assertEqual(_extract_text_from_txt(path, max_chars=3), "aéé")
+
+    def test_non_utf8_falls_back_to_detection(self):
+        text = "Le café était près de la gare, déjà fermé à cette heure-là. " * 20
+        result = _extract_text_from_txt(self._write(text.encode("latin-1")))
+        # Single-byte codepage detected: nothing dropped, ASCII intact
+        self.assertEqual(len(result), len(text))
+        self.assertTrue(result.startswith("Le caf"))
+
+    def test_empty_file(self):
+        self.assertEqual(_extract_text_from_txt(self._write(b"")), "")
+
+
+class ExtractTextFromPdfTests(SimpleTestCase):
+    PAGES = 7
+
+    def setUp(self):
+        handle = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+        handle.close()
+        self.addCleanup(os.unlink, handle.name)
+        with fitz.open() as doc:
+            for i in range(self.PAGES):
+                doc.new_page().insert_text((72, 72), f"page {i:02d} marker")
+            doc.save(handle.name)
+        self.path = handle.name
+
+    def _extract_parallel(self, **kwargs):
+        with mock.patch("research.tasks._pdf_workers", return_value=2), mock.patch.dict(
+            os.environ, {"ODR_PDF_PAGES_PER_CHUNK": "2"}
+        ):
+            return _extract_text_from_pdf(self.path, **kwargs)
+
+    def test_parallel_matches_sequential_page_order(self):
+        with mock.patch("research.tasks._pdf_workers", return_value=1):
+            sequential = _extract_text_from_pdf(self.path)
+        parallel = self._extract_parallel()
+
+        self.assertEqual(parallel, sequential)
+        positions = [parallel.index(f"page {i:02d} marker") for i in range(self.PAGES)]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_parallel_stops_at_max_chars(self):
+        full = self._extract_parallel()
+        limit = full.index("page 03")
+        self.assertEqual(self._extract_parallel(max_chars=limit), full[:limit])
+
+    def test_page_range_worker_runs_under_spawn(self):
+        # A spawned child imports research.pdf from scratch, without django.setup()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            text = executor.submit(extract_page_range, self.path, 2, 4).result()
+        self.assertEqual(text, extract_page_range(self.path, 2, 4))
+        self.assertIn("page 02 marker", text)
+        self.assertIn("page 03 marker", text)
+        self.assertNotIn("page 04 marker", text)
+
+
+class ReportSummaryFilterTests(SimpleTestCase):
+    def _run(self, chunks):
+        summary_filter = ReportSummaryFilter()
+        return "".join(summary_filter.feed(chunk) for chunk in chunks) + summary_filter.flush()
+
+    def test_passes_text_without_tag(self):
+        self.assertEqual(self._run(["# Rep", "ort <b> x"]), "# Report <b> x")
+
+    def test_drops_summary_block(self):
+        self.assertEqual(self._run(["Body\n<report_summary>- a</report_summary>"]), "Body")
+
+    def test_tags_split_across_chunks(self):
+        chunks = ["Body <rep", "ort_sum", "mary>- a\n- b</report_", "summary> tail"]
+        self.assertEqual(self._run(chunks), "Body\n\ntail")
+
+    def test_unclosed_block_drops_rest(self):
+        self.assertEqual(self._run(["Body<report_summary>- a", " - b"]), "Body")
+
+    def test_only_last_tag_starts_summary(self):
+        text = "Mentions <report_summary> literally.\nMore body\n<report_summary>- real</report_summary>"
+        chunks = [text[i : i + 7] for i in range(0, len(text), 7)]
+        self.assertEqual(self._run(chunks), "Mentions <report_summary> literally.\nMore body")
+
+    def test_matches_split_report_summary(self):
+        texts = [
+            "# Report\n\nBody  \n",
+            "Body\n<report_summary>- one</report_summary>\n\nTrailing note.",
+            "A <report_summary>x</report_summary> mid\n<report_summary>y",
+        ]
+        for text in texts:
+            for size in (1, 3, 16, len(text)):
+                chunks = [text[i : i + size] for i in range(0, len(text), size)]
+                with self.subTest(text=text, size=size):
+                    self.assertEqual(self._run(chunks), split_report_summary(text)[0])
+
+    def test_partial_tag_prefix_is_released(self):
+        summary_filter = ReportSummaryFilter()
+        self.assertEqual(summary_filter.feed("a <rep"), "a")
+        self.assertEqual(summary_filter.feed("ly"), " <reply")
+
+
+class ToStreamEventTests(SimpleTestCase):
+    @staticmethod
+    def _chain(kind, name, node=None):
+        return {"event": kind, "name": name, "metadata": {"langgraph_node": node or name}}
+
+    @staticmethod
+    def _token(content, node="final_report_generation"):
+        return {
+            "event": "on_chat_model_stream",
+            "metadata": {"langgraph_node": node},
+            "data": {"chunk": SimpleNamespace(content=content)},
+        }
+
+    def test_workflow_node_start_and_end(self):
+        self.assertEqual(
+            to_stream_event(self._chain("on_chain_start", "research_supervisor")),
+            {"type": "node", "node": "research_supervisor", "phase": "start"},
+        )
+        self.assertEqual(
+            to_stream_event(self._chain("on_chain_end", "final_report_generation")),
+            {"type": "node", "node": "final_report_generation", "phase": "end"},
+        )
+
+    def test_nested_or_unknown_chains_are_dropped(self):
+        # Same name reported from inside a subgraph node
+        self.assertIsNone(to_stream_event(self._chain("on_chain_start", "research_supervisor", "researcher")))
+        self.assertIsNone(to_stream_event(self._chain("on_chain_start", "researcher")))
+        self.assertIsNone(to_stream_event({"event": "on_tool_start", "name": "tavily_search"}))
+
+    def test_report_tokens_only(self):
+        self.assertEqual(to_stream_event(self._token("Hel")), {"type": "token", "content": "Hel"})
+        self.assertIsNone(to_stream_event(self._token("thinking", node="researcher")))
+        self.assertIsNone(to_stream_event(self._token("")))
+
+    def test_list_content_chunks(self):
+        content = [{"type": "text", "text": "Hel"}, "skipped", {"type": "text", "text": "lo"}, {"type": "image"}]
+        self.assertEqual(to_stream_event(self._token(content)), {"type": "token", "content": "Hello"})
+        self.assertIsNone(to_stream_event(self._token([{"type": "tool_use"}])))
+
+
+class StreamPublisherTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("research.events.publish_event")
+        self.publish = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _published(self):
+        return [call.args for call in self.publish.call_args_list]
+
+    def _send_all(self, publisher, payloads, flush=True):
+        async def send():
+            for payload in payloads:
+                await publisher.send(payload)
+            if flush:
+                await publisher.flush()
+
+        run_coro(send())
+
+    def test_tokens_are_coalesced(self):
+        publisher = StreamPublisher("s1", flush_chars=100, flush_seconds=60)
+        tokens = [{"type": "token", "content": part} for part in ("a", "b", "c")]
+
+        self._send_all(publisher, tokens, flush=False)
+        self.assertEqual(self._published(), [])
+
+        self._send_all(publisher, [])
+        self.assertEqual(self._published(), [("s1", {"type": "token", "content": "abc"})])
+
+    def test_flush_by_size(self):
+        publisher = StreamPublisher("s1", flush_chars=4, flush_seconds=60)
+        tokens = [{"type": "token", "content": part} for part in ("ab", "cd", "e")]
+        self._send_all(publisher, tokens, flush=False)
+        self.assertEqual(self._published(), [("s1", {"type": "token", "content": "abcd"})])
+
+    def test_pending_tokens_go_out_before_other_events(self):
+        publisher = StreamPublisher("s1", flush_chars=100, flush_seconds=60)
+        node = {"type": "node", "node": "final_report_generation", "phase": "end"}
+        self._send_all(publisher, [{"type": "token", "content": "x"}, {"type": "token", "content": "y"}, node])
+        self.assertEqual(
+            self._published(),
+            [("s1", {"type": "token", "content": "xy"}), ("s1", node)],
+        )
+
+    def test_flush_without_tokens_publishes_nothing(self):
+        self._send_all(StreamPublisher("s1"), [])
+        self.assertEqual(self._published(), [])
+
+
+class IterResearchEventsTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create(username="streamer")
+        self.session = ResearchSession.objects.create(
+            user=user, original_query="q", status=ResearchSession.Status.RUNNING
+        )
+        self.pubsub = mock.Mock()
+        patcher = mock.patch("research.views.subscribe", return_value=self.pubsub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _events(self):
+        return list(_iter_research_events(str(self.session.id)))
+
+    @staticmethod
+    def _message(event):
+        return {"type": "message", "data": json.dumps(event).encode("utf-8")}
+
+    def test_terminal_status_returns_immediately(self):
+        ResearchSession.objects.filter(id=self.session.id).update(status=ResearchSession.Status.COMPLETED)
+        self.assertEqual(self._events(), ['data: {"type": "status", "status": "COMPLETED"}\n\n'])
+        self.pubsub.get_message.assert_not_called()
+        self.pubsub.close.assert_called_once()
+
+    def test_relays_until_terminal_event(self):
+        node = {"type": "node", "node": "research_supervisor", "phase": "start"}
+        done = {"type": "status", "status": "COMPLETED"}
+        self.pubsub.get_message.side_effect = [self._message(node), self._message(done)]
+
+        events = self._events()
+
+        self.assertEqual(
+            events,
+            [
+                'data: {"type": "status", "status": "RUNNING"}\n\n',
+                f"data: {json.dumps(node)}\n\n",
+                f"data: {json.dumps(done)}\n\n",
+            ],
+        )
+        self.assertEqual(self.pubsub.get_message.call_count, 2)
+        self.pubsub.close.assert_called_once()
+
+    def test_idle_timeout_keeps_alive_then_sees_missed_completion(self):
+        def get_message(timeout):
+            if self.pubsub.get_message.call_count == 2:
+                ResearchSession.objects.filter(id=self.session.id).update(status=ResearchSession.Status.FAILED)
+            return None
+
+        self.pubsub.get_message.side_effect = get_message
+
+        self.assertEqual(
+            self._events(),
+            [
+                'data: {"type": "status", "status": "RUNNING"}\n\n',
+                ": keepalive\n\n",
+                'data: {"type": "status", "status": "FAILED"}\n\n',
+            ],
+        )
+        self.pubsub.close.assert_called_once()
+
+
+class RunCoroTests(SimpleTestCase):
+    def test_leftover_tasks_and_generators_are_cleaned_up(self):
+        seen = {}
+
+        async def leftover():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                seen["cancelled"] = True
+                raise
+
+        async def agen():
+            try:
+                yield 1
+                yield 2
+            finally:
+                seen["agen_closed"] = True
+
+        async def main():
+            asyncio.ensure_future(leftover())
+            gen = agen()
+            await gen.__anext__()
+            seen["gen"] = gen
+            return "done"
+
+        self.assertEqual(run_coro(main()), "done")
+        self.assertTrue(seen.get("cancelled"))
+        self.assertTrue(seen.get("agen_closed"))
+
+    def test_loop_is_reused(self):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = run_coro(current_loop())
+        self.assertIs(run_coro(current_loop()), first)
+        self.assertIs(get_loop(), first)
+        self.assertFalse(first.is_closed())
+
+
+class ResearchDetailSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="tester")
+
+    @staticmethod
+    def _legacy_detail(session):
+        # The dict research_detail built by hand before the serializer
+        report = getattr(session, "report", None)
+        summary = getattr(session, "summary", None)
+        reasoning = getattr(session, "reasoning", None)
+        cost = getattr(session, "cost", None)
+        return {
+            "id": str(session.id),
+            "parent": str(session.parent_id) if session.parent_id else None,
+            "original_query": session.original_query,
+            "status": session.status,
+            "trace_id": session.trace_id,
+            "created_at": session.created_at,
+            "updated_at": session.updated_at,
+            "report": report.report if report else "",
+            "sources": report.sources if report else [],
+            "summary": summary.summary if summary else "",
+            "reasoning": reasoning.reasoning if reasoning else "",
+            "token_usage": {
+                "input_tokens": cost.input_tokens if cost else 0,
+                "output_tokens": cost.output_tokens if cost else 0,
+                "total_tokens": cost.total_tokens if cost else 0,
+            },
+            "estimated_cost_usd": str(cost.estimated_cost_usd) if cost else "0",
+        }
+
+    @staticmethod
+    def _rendered(data):
+        return json.loads(JSONRenderer().render(data))
+
+    def _assert_matches_legacy(self, session_id):
+        session = ResearchSession.objects.select_related("report", "summary", "reasoning", "cost").get(
+            id=session_id
+        )
+        with self.assertNumQueries(0):
+            data = ResearchDetailSerializer(session).data
+        self.assertEqual(self._rendered(data), self._rendered(self._legacy_detail(session)))
+        return data
+
+    def test_session_without_results(self):
+        session = ResearchSession.objects.create(user=self.user, original_query="q")
+        data = self._assert_matches_legacy(session.id)
+
+        self.assertIsNone(data["parent"])
+        self.assertEqual(data["report"], "")
+        self.assertEqual(data["sources"], [])
+        self.assertEqual(data["token_usage"], {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0})
+        self.assertEqual(data["estimated_cost_usd"], "0")
+
+    def test_completed_session_with_parent(self):
+        parent = ResearchSession.objects.create(user=self.user, original_query="first")
+        session = ResearchSession.objects.create(
+            user=self.user,
+            parent=parent,
+            original_query="follow-up",
+            status=ResearchSession.Status.COMPLETED,
+            trace_id="trace-1",
+        )
+        ResearchReport.objects.create(
+            session=session, report="# Report", sources=[{"title": "A", "url": "https://a.example"}]
+        )
+        ResearchSummary.objects.create(session=session, summary="- a")
+        ResearchReasoning.objects.create(session=session, reasoning="High-level reasoning:")
+        ResearchCost.objects.create(
+            session=session,
+            input_tokens=120,
+            output_tokens=30,
+            total_tokens=150,
+            estimated_cost_usd=Decimal("0.001250"),
+        )
+        data = self._assert_matches_legacy(session.id)
+
+        self.assertEqual(str(data["parent"]), str(parent.id))
+        self.assertEqual(data["estimated_cost_usd"], "0.001250")
+        self.assertEqual(data["token_usage"], {"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+
+    def test_partial_results_fill_defaults(self):
+        session = ResearchSession.objects.create(
+            user=self.user, original_query="q", status=ResearchSession.Status.FAILED
+        )
+        ResearchReasoning.objects.create(session=session, reasoning="Run failed: ValueError: boom")
+        data = self._assert_matches_legacy(session.id)
+
+        self.assertEqual(data["reasoning"], "Run failed: ValueError: boom")
+        self.assertEqual(data["summary"], "")
+        self.assertEqual(data["estimated_cost_usd"], "0")
@@ -1,31 +1,42 @@
+import json
 import os
 
 from django.contrib.auth import get_user_model
-from rest_framework.decorators import api_view, parser_classes
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, parser_classes, renderer_classes
 from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 
+from .events import subscribe
 from .models import ResearchSession, UploadedDocument
 from .serializers import (
     ContinueResearchSerializer,
+    ResearchDetailSerializer,
     ResearchSessionListSerializer,
     StartResearchSerializer,
 )
-from .tasks import process_uploaded_document, run_research  # ✅ use real task (remove ping_task)
+from .tasks import process_pending_documents_batch, run_research  # ✅ use real task (remove ping_task)
+
+
+_DEV_USER = None
 
 
 def _get_or_create_dev_user():
     """
     TEMP for development only.
     Real auth later. For now we need a user_id for DB.
+    Looked up once per process; views only use it for FK filters/assignment.
     """
-    User = get_user_model()
-    user, _ = User.objects.get_or_create(
-        username="devuser",
-        defaults={"email": "dev@local"},
-    )
-    return user
+    global _DEV_USER
+    if _DEV_USER is None:
+        User = get_user_model()
+        _DEV_USER, _ = User.objects.get_or_create(
+            username="devuser",
+            defaults={"email": "dev@local"},
+        )
+    return _DEV_USER
 
 
 @api_view(["POST"])
@@ -64,7 +75,15 @@ def start_research(request):
 @api_view(["GET"])
 def research_history(request):
     user = _get_or_create_dev_user()
-    qs = ResearchSession.objects.filter(user=user).order_by("-created_at")
+    qs = (
+        ResearchSession.objects.filter(user=user)
+        .only("id", "original_query", "status", "trace_id", "parent_id", "created_at", "updated_at")
+        .order_by("-created_at")
+    )
+    source_url = request.query_params.get("source_url")
+    if source_url:
+        # Served by the GIN index on ResearchReport.sources
+        qs = qs.filter(report__sources__contains=[{"url": source_url}])
     data = ResearchSessionListSerializer(qs, many=True).data
     return Response(data, status=status.HTTP_200_OK)
 
@@ -72,39 +91,98 @@ def research_history(request):
 @api_view(["GET"])
 def research_detail(request, research_id):
     user = _get_or_create_dev_user()
-    session = ResearchSession.objects.filter(id=research_id, user=user).first()
+    # One JOIN for all result tables instead of a query per reverse one-to-one.
+    session = (
+        ResearchSession.objects.select_related("report", "summary", "reasoning", "cost")
+        .filter(id=research_id, user=user)
+        .first()
+    )
     if not session:
         return Response({"error": "not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    report = getattr(session, "report", None)
-    summary = getattr(session, "summary", None)
-    reasoning = getattr(session, "reasoning", None)
-    cost = getattr(session, "cost", None)
-
     return Response(
-        {
-            "id": str(session.id),
-            "parent": str(session.parent_id) if session.parent_id else None,
-            "original_query": session.original_query,
-            "status": session.status,
-            "trace_id": session.trace_id,
-            "created_at": session.created_at,
-            "updated_at": session.updated_at,
-            "report": report.report if report else "",
-            "sources": report.sources if report else [],
-            "summary": summary.summary if summary else "",
-            "reasoning": reasoning.reasoning if reasoning else "",
-            "token_usage": {
-                "input_tokens": cost.input_tokens if cost else 0,
-                "output_tokens": cost.output_tokens if cost else 0,
-                "total_tokens": cost.total_tokens if cost else 0,
-            },
-            "estimated_cost_usd": str(cost.estimated_cost_usd) if cost else "0",
-        },
+        ResearchDetailSerializer(session).data,
         status=status.HTTP_200_OK,
     )
 
 
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets DRF negotiate `Accept: text/event-stream` (sent by EventSource);
+    error payloads are emitted as a single SSE message.
+    """
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return _sse(data)
+
+
+_TERMINAL_STATUSES = {ResearchSession.Status.COMPLETED, ResearchSession.Status.FAILED}
+_STREAM_KEEPALIVE_SECONDS = 15
+
+
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload, default=str)}\n\n"
+
+
+def _iter_research_events(session_id: str):
+    # Subscribe before reading status so a completion can't slip in between
+    pubsub = subscribe(session_id)
+    try:
+        current = ResearchSession.objects.filter(id=session_id).values_list("status", flat=True).first()
+        yield _sse({"type": "status", "status": current})
+        if current in _TERMINAL_STATUSES:
+            return
+
+        while True:
+            message = pubsub.get_message(timeout=_STREAM_KEEPALIVE_SECONDS)
+            if message is None:
+                # Re-check in case the terminal event was missed (e.g. worker crash)
+                current = (
+                    ResearchSession.objects.filter(id=session_id).values_list("status", flat=True).first()
+                )
+                if current in _TERMINAL_STATUSES:
+                    yield _sse({"type": "status", "status": current})
+                    return
+                yield ": keepalive\n\n"
+                continue
+
+            data = message["data"]
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            yield f"data: {data}\n\n"
+
+            event = json.loads(data)
+            if event.get("type") == "status" and event.get("status") in _TERMINAL_STATUSES:
+                return
+    finally:
+        pubsub.close()
+
+
+@api_view(["GET"])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def research_stream(request, research_id):
+    """
+    Server-Sent Events feed of a running research session (node progress,
+    final report tokens, status changes). Results are still persisted by Celery.
+    Each open stream holds a worker thread for the whole run, so serve this with
+    threaded/gevent gunicorn workers, not the default sync worker (see README).
+    """
+    user = _get_or_create_dev_user()
+    if not ResearchSession.objects.filter(id=research_id, user=user).exists():
+        return Response({"error": "not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    response = StreamingHttpResponse(
+        _iter_research_events(str(research_id)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @api_view(["POST"])
 @parser_classes([MultiPartParser, FormParser])
 def upload_document(request, research_id):
@@ -127,7 +205,11 @@ def upload_document(request, research_id):
         filename=uploaded.name,
     )
 
-    process_uploaded_document.delay(str(doc.id))
+    # Delayed so a burst of uploads lands in one batch; the first run claims them all
+    process_pending_documents_batch.apply_async(
+        args=[str(session.id)],
+        countdown=int(os.environ.get("ODR_UPLOAD_BATCH_DELAY_SECONDS", "5")),
+    )
 
     return Response(
         {"document_id": str(doc.id), "status": "processing"},
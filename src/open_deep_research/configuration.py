@@ -210,6 +210,16 @@ class Configuration(BaseModel):
             }
         }
     )
+    include_report_summary: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Whether the final report model should also write a short bullet-point summary (returned as report_summary) in the same call"
+            }
+        }
+    )
     # MCP server configuration
     mcp_config: Optional[MCPConfig] = Field(
         default=None,
@@ -25,6 +25,7 @@ from open_deep_research.prompts import (
     compress_research_system_prompt,
     final_report_generation_prompt,
     lead_researcher_prompt,
+    report_summary_instructions,
     research_system_prompt,
     transform_messages_into_research_topic_prompt,
 )
@@ -49,6 +50,7 @@ from open_deep_research.utils import (
     is_token_limit_exceeded,
     openai_websearch_called,
     remove_up_to_last_ai_message,
+    split_report_summary,
     think_tool,
 )
 
@@ -645,15 +647,24 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
                 findings=findings,
                 date=get_today_str()
             )
+            if configurable.include_report_summary:
+                final_report_prompt += report_summary_instructions
             
             # Generate the final report
             final_report = await configurable_model.with_config(writer_model_config).ainvoke([
                 HumanMessage(content=final_report_prompt)
             ])
             
+            # Split off the fused summary (if requested) so the report stays clean
+            report_text, report_summary = final_report.content, ""
+            if configurable.include_report_summary and isinstance(report_text, str):
+                report_text, report_summary = split_report_summary(report_text)
+                final_report = final_report.model_copy(update={"content": report_text})
+            
             # Return successful report generation
             return {
-                "final_report": final_report.content, 
+                "final_report": report_text, 
+                "report_summary": report_summary,
                 "messages": [final_report],
                 **cleared_state
             }
@@ -308,6 +308,15 @@ Format the report in clear markdown with proper structure and include source ref
 """
 
 
+report_summary_instructions = """
+
+After the report (including the Sources section), also write a short summary for a results list:
+- 5-10 bullet points covering the key findings, numbers, and conclusions
+- Do not include chain-of-thought
+- Wrap the bullet points in <report_summary></report_summary> tags, and put nothing after the closing tag
+"""
+
+
 summarize_webpage_prompt = """You are tasked with summarizing the raw content of a webpage retrieved from a web search. Your goal is to create a summary that preserves the most important information from the original web page. This summary will be used by a downstream research agent, so it's crucial to maintain the key details without losing essential information.
 
 Here is the raw content of the webpage:
@@ -869,6 +869,33 @@ def remove_up_to_last_ai_message(messages: list[MessageLikeRepresentation]) -> l
 # Misc Utils
 ##########################
 
+def split_report_summary(text: str) -> tuple[str, str]:
+    """Split a final report into the report body and its <report_summary> block.
+    
+    Any text after the closing tag is kept as part of the report. An unclosed
+    block is treated as running to the end of the text.
+    
+    Args:
+        text: Raw final report model output
+        
+    Returns:
+        Tuple of (report without the summary block, summary text or "" if absent)
+    """
+    start = text.rfind("<report_summary>")
+    if start == -1:
+        return text, ""
+    
+    summary = text[start + len("<report_summary>"):]
+    trailing = ""
+    end = summary.find("</report_summary>")
+    if end != -1:
+        summary, trailing = summary[:end], summary[end + len("</report_summary>"):]
+    
+    report = text[:start].rstrip()
+    if trailing.strip():
+        report = f"{report}\n\n{trailing.strip()}"
+    return report, summary.strip()
+
 def get_today_str() -> str:
     """Get current date formatted for display in prompts and outputs.
     
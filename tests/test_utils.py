@@ -0,0 +1,34 @@
+"""Unit tests for open_deep_research.utils helpers."""
+
+from open_deep_research.utils import split_report_summary
+
+
+def test_split_report_summary_without_tag():
+    """Reports without a summary block are returned unchanged."""
+    assert split_report_summary("# Report\n\nBody") == ("# Report\n\nBody", "")
+
+
+def test_split_report_summary_closed_tag():
+    """A closed block is removed from the report and returned as the summary."""
+    text = "# Report\n\n### Sources\n[1] A: https://a.com\n\n<report_summary>\n- one\n- two\n</report_summary>"
+    assert split_report_summary(text) == (
+        "# Report\n\n### Sources\n[1] A: https://a.com",
+        "- one\n- two",
+    )
+
+
+def test_split_report_summary_unclosed_tag():
+    """An unclosed block runs to the end of the text."""
+    assert split_report_summary("Body\n<report_summary>\n- one\n- two") == ("Body", "- one\n- two")
+
+
+def test_split_report_summary_keeps_text_after_closing_tag():
+    """Text after the closing tag stays in the report instead of being dropped."""
+    text = "Body\n<report_summary>- one</report_summary>\nTrailing note."
+    assert split_report_summary(text) == ("Body\n\nTrailing note.", "- one")
+
+
+def test_split_report_summary_uses_last_block():
+    """Only the last block is treated as the summary."""
+    text = "Mentions <report_summary> literally.\n<report_summary>- real</report_summary>"
+    assert split_report_summary(text) == ("Mentions <report_summary> literally.", "- real")